@@ -4,16 +4,14 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
 class Product(Enum):
+    # value is the canonical string used in input dictionary keys
     MTPL = "mtpl"
     LIMITED_CASCO = "limited_casco"
     CASCO = "casco"
 
-    @property
-    def key(self) -> str:
-        """Canonical string used in input dictionary keys."""
-        return self.value
-
 
 class Variant(Enum):
     COMPACT = "compact"
@@ -21,21 +19,13 @@ class Variant(Enum):
     COMFORT = "comfort"
     PREMIUM = "premium"
 
-    @property
-    def key(self) -> str:
-        return self.value
-
 
 class Deductible(Enum):
+    # value is the numeric deductible amount
     D100 = 100
     D200 = 200
     D500 = 500
 
-    @property
-    def amount(self) -> int:
-        """Numeric deductible amount."""
-        return int(self.value)
-
 # Reference prices & factors
 REFERENCE_AVG_PRICE: dict[Product, float] = {
     Product.MTPL: 400.0,
@@ -62,14 +52,33 @@ VARIANT_FACTOR: dict[Variant, float] = {
     Variant.PREMIUM: 1.14,
 }
 
+# Hot-path constants: plain str/float lookups avoid Enum hashing in inner loops
+MTPL_KEY: str = Product.MTPL.value
+
+# Product ordinals for the struct-of-arrays parsed layout
+PRODUCT_ORD: dict[Product, int] = {p: i for i, p in enumerate(Product)}
+
 VALID_PRODUCTS: frozenset[Product] = frozenset(Product)
 VALID_VARIANTS: frozenset[Variant] = frozenset(Variant)
 VALID_DEDUCTIBLES: frozenset[Deductible] = frozenset(Deductible)
 
+# Fixed-slot group layouts: "is the 200 deductible present" becomes a None
+# check on a tuple slot instead of an Enum-hashed dict lookup.
+DedSlots = Tuple[Optional[str], Optional[str], Optional[str]]       # (100, 200, 500)
+VarSlots = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]  # (compact, basic, comfort, premium)
+
+_DED_SLOT: dict[Deductible, int] = {Deductible.D100: 0, Deductible.D200: 1, Deductible.D500: 2}
+_VAR_SLOT: dict[Variant, int] = {
+    Variant.COMPACT: 0,
+    Variant.BASIC: 1,
+    Variant.COMFORT: 2,
+    Variant.PREMIUM: 3,
+}
+
 
 # Parsed representation
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PricingItem:
     """
         Parsed representation of a key in the prices dict.
@@ -84,7 +93,7 @@ class PricingItem:
 
 # Validation & fixing reports
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Violation:
     category: str   # "product" | "deductible" | "variant"
     rule: str       # short rule id
@@ -95,17 +104,20 @@ class Violation:
     right_value: float
 
 
-@dataclass
+@dataclass(slots=True)
 class FixReport:
     violations_before: List[Violation] = field(default_factory=list)
     violations_after: List[Violation] = field(default_factory=list)
     fix_log: List[str] = field(default_factory=list)
+    enabled: bool = True
 
-    def log(self, msg: str) -> None:
-        self.fix_log.append(msg)
+    def log(self, fmt: str, *args) -> None:
+        """Logger-style lazy formatting: skipped entirely when disabled."""
+        if self.enabled:
+            self.fix_log.append(fmt % args if args else fmt)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FixResult:
     fixed_prices: Dict[str, float]
     converged: bool
@@ -113,6 +125,75 @@ class FixResult:
     report: FixReport
 
 
+@dataclass(frozen=True, slots=True)
+class ParsedInput:
+    """
+        Parsed items together with their groupings, built in a single pass by
+        the parser so the per-iteration fix/validate code never has to rescan
+        the item list.
+    """
+    items: Tuple[PricingItem, ...]
+    by_product: Dict[Product, List[str]]
+    by_pv: Dict[Tuple[Product, Variant], DedSlots]
+    by_pd: Dict[Tuple[Product, Deductible], VarSlots]
+    by_vd: Dict[Tuple[Variant, Deductible], Dict[Product, str]]
+    # Struct-of-arrays view: keys in input order plus parallel index data, so
+    # numeric passes can address prices by position instead of by string.
+    keys: Tuple[str, ...] = ()
+    key_index: Dict[str, int] = field(default_factory=dict)
+    # (limited_casco key, casco key) for every (variant, deductible) present
+    # in both products; the LC < C rule iterates this directly.
+    lc_c_pairs: Tuple[Tuple[str, str], ...] = ()
+    product_ord: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int8))
+    product_idx: Dict[Product, np.ndarray] = field(default_factory=dict)
+
+
+def build_parsed_input(items: List[PricingItem]) -> ParsedInput:
+    """
+        Build all four groupings in one traversal of `items`.
+    """
+    by_product: Dict[Product, List[str]] = {}
+    pv_slots: Dict[Tuple[Product, Variant], List[Optional[str]]] = {}
+    pd_slots: Dict[Tuple[Product, Deductible], List[Optional[str]]] = {}
+    by_vd: Dict[Tuple[Variant, Deductible], Dict[Product, str]] = {}
+
+    for it in items:
+        by_product.setdefault(it.product, []).append(it.key)
+        if it.product == Product.MTPL:
+            continue
+        # by spec, non-MTPL always has both
+        assert it.variant is not None
+        assert it.deductible is not None
+        pv_slots.setdefault((it.product, it.variant), [None, None, None])[_DED_SLOT[it.deductible]] = it.key
+        pd_slots.setdefault((it.product, it.deductible), [None, None, None, None])[_VAR_SLOT[it.variant]] = it.key
+        by_vd.setdefault((it.variant, it.deductible), {})[it.product] = it.key
+
+    keys = tuple(it.key for it in items)
+    product_ord = np.fromiter((PRODUCT_ORD[it.product] for it in items), dtype=np.int8, count=len(items))
+    product_idx = {
+        p: np.where(product_ord == o)[0].astype(np.intp) for p, o in PRODUCT_ORD.items()
+    }
+
+    lc_c_pairs = tuple(
+        (m[Product.LIMITED_CASCO], m[Product.CASCO])
+        for m in by_vd.values()
+        if Product.LIMITED_CASCO in m and Product.CASCO in m
+    )
+
+    return ParsedInput(
+        items=tuple(items),
+        by_product=by_product,
+        by_pv={gk: tuple(slots) for gk, slots in pv_slots.items()},
+        by_pd={gk: tuple(slots) for gk, slots in pd_slots.items()},
+        by_vd=by_vd,
+        keys=keys,
+        key_index={k: i for i, k in enumerate(keys)},
+        lc_c_pairs=lc_c_pairs,
+        product_ord=product_ord,
+        product_idx=product_idx,
+    )
+
+
 # Helpers
 
 def keys_by_product(items: List[PricingItem]) -> Dict[Product, List[str]]:
@@ -125,33 +206,34 @@ def keys_by_product(items: List[PricingItem]) -> Dict[Product, List[str]]:
     return out
 
 
-def group_by_product_and_variant(items: List[PricingItem]) -> Dict[Tuple[Product, Variant], Dict[Deductible, str]]:
+def group_by_product_and_variant(items: List[PricingItem]) -> Dict[Tuple[Product, Variant], DedSlots]:
     """
-        (product, variant) -> {deductible -> key}
+        (product, variant) -> (key100, key200, key500), None for missing slots.
     """
-    out: Dict[Tuple[Product, Variant], Dict[Deductible, str]] = {}
+    slots: Dict[Tuple[Product, Variant], List[Optional[str]]] = {}
     for it in items:
         if it.product == Product.MTPL:
             continue
         # by spec, non-MTPL always has both
         assert it.variant is not None
         assert it.deductible is not None
-        out.setdefault((it.product, it.variant), {})[it.deductible] = it.key
-    return out
+        slots.setdefault((it.product, it.variant), [None, None, None])[_DED_SLOT[it.deductible]] = it.key
+    return {gk: tuple(s) for gk, s in slots.items()}
 
 
-def group_by_product_and_deductible(items: List[PricingItem]) -> Dict[Tuple[Product, Deductible], Dict[Variant, str]]:
+def group_by_product_and_deductible(items: List[PricingItem]) -> Dict[Tuple[Product, Deductible], VarSlots]:
     """
-        (product, deductible) -> {variant -> key}
+        (product, deductible) -> (compact, basic, comfort, premium) keys,
+        None for missing slots.
     """
-    out: Dict[Tuple[Product, Deductible], Dict[Variant, str]] = {}
+    slots: Dict[Tuple[Product, Deductible], List[Optional[str]]] = {}
     for it in items:
         if it.product == Product.MTPL:
             continue
         assert it.variant is not None
         assert it.deductible is not None
-        out.setdefault((it.product, it.deductible), {})[it.variant] = it.key
-    return out
+        slots.setdefault((it.product, it.deductible), [None, None, None, None])[_VAR_SLOT[it.variant]] = it.key
+    return {gk: tuple(s) for gk, s in slots.items()}
 
 
 def group_by_variant_and_deductible(items: List[PricingItem]) -> Dict[Tuple[Variant, Deductible], Dict[Product, str]]:
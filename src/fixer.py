@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from statistics import median
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    _HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba installed
+    _HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op decorator so the kernel stays importable without numba."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 from src.core import (
-    PricingItem,
+    ParsedInput,
     FixReport,
     Product,
     Variant,
@@ -16,35 +29,406 @@ from src.core import (
     RATIO_C_OVER_LC,
     DEDUCTIBLE_FACTOR,
     VARIANT_FACTOR,
-    keys_by_product,
-    group_by_product_and_variant,
-    group_by_product_and_deductible,
-    group_by_variant_and_deductible,
+    MTPL_KEY,
 )
 
 
-class BasePriceFixer(ABC):
-    @abstractmethod
-    def fix_pass(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
-        raise NotImplementedError
+# Factors and reference averages resolved once at import time so inner loops
+# index plain floats instead of Enum-keyed dicts.
+_REF_MTPL = REFERENCE_AVG_PRICE[Product.MTPL]
+_REF_LC = REFERENCE_AVG_PRICE[Product.LIMITED_CASCO]
+_REF_C = REFERENCE_AVG_PRICE[Product.CASCO]
+_F200 = DEDUCTIBLE_FACTOR[Deductible.D200]
+_F500 = DEDUCTIBLE_FACTOR[Deductible.D500]
+_F_COMFORT = VARIANT_FACTOR[Variant.COMFORT]
+_F_PREMIUM = VARIANT_FACTOR[Variant.PREMIUM]
+
+
+class PriceVec:
+    """
+        Flat float64 view of the prices for vectorized group math.
+
+        Holds the key order, a key -> index map and a contiguous values array
+        so group reductions (min/mean) and group scalings run as single NumPy
+        ops instead of per-key Python loops over a dict. The engine builds one
+        per solve and keeps it live across all validate/fix iterations; the
+        prices dict is only rebuilt from it once at the end via writeback.
+    """
+
+    def __init__(self, prices: Dict[str, float], parsed: ParsedInput):
+        self.keys: Tuple[str, ...] = parsed.keys
+        self.idx: Dict[str, int] = parsed.key_index
+        # map with the bound C getter avoids a Python frame per element.
+        self.arr: np.ndarray = np.fromiter(
+            map(prices.__getitem__, self.keys), dtype=np.float64, count=len(self.keys)
+        )
+        # Indices written during this pass; feeds the dirty set of the next pass.
+        self.touched: set = set()
+
+    @classmethod
+    def from_array(cls, arr: np.ndarray, parsed: ParsedInput) -> "PriceVec":
+        """Wrap an existing float64 row (e.g. one row of a batch) in place."""
+        vec = cls.__new__(cls)
+        vec.keys = parsed.keys
+        vec.idx = parsed.key_index
+        vec.arr = arr
+        vec.touched = set()
+        return vec
+
+    def __getitem__(self, key: str) -> float:
+        """Key-based read so dict-shaped consumers (the validator) work as-is."""
+        return self.arr[self.idx[key]]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.idx
+
+    def index(self, keys: List[str]) -> np.ndarray:
+        """List of dict keys -> np.intp array usable for fancy indexing."""
+        return np.fromiter(map(self.idx.__getitem__, keys), dtype=np.intp, count=len(keys))
+
+    def writeback(self, prices: Dict[str, float]) -> None:
+        """Scatter the (possibly modified) values back into the dict."""
+        prices.update(zip(self.keys, self.arr.tolist()))
+
+
+class _DedTable(NamedTuple):
+    """Deductible ladders as parallel arrays: one row per (product, variant)."""
+    keys200: List[Optional[str]]
+    keys500: List[Optional[str]]
+    i100: np.ndarray
+    i200: np.ndarray  # -1 where the 200 deductible is missing
+    i500: np.ndarray  # -1 where the 500 deductible is missing
+
+
+class _VarTable(NamedTuple):
+    """Variant ladders as parallel arrays: one row per (product, deductible)."""
+    keys_comfort: List[Optional[str]]
+    keys_premium: List[Optional[str]]
+    i_base: np.ndarray  # shape (n, 2): compact/basic indices, duplicated when one is missing
+    i_comfort: np.ndarray  # -1 where comfort is missing
+    i_premium: np.ndarray  # -1 where premium is missing
+
+
+@njit(cache=True)
+def _fix_pass_kernel(
+    arr,
+    mtpl_i,
+    lc_gidx,
+    c_gidx,
+    lc_pair_i,
+    c_pair_i,
+    i100,
+    i200,
+    i500,
+    i_base,
+    i_comfort,
+    i_premium,
+    tau_outlier,
+):  # pragma: no cover - compiled; semantics covered via the method path
+    """
+        Fused scalar-loop fix pass over the flat price array.
+
+        Mirrors enforce_all rule for rule (anchor, product minima, LC < C,
+        deductible ladder, variant ladder) but works purely on integer index
+        arrays and float64 values so numba can compile it. No logging and no
+        dirty tracking happen in here; the caller only uses this path when the
+        fix log is disabled. Returns whether anything was modified.
+    """
+    changed = False
+
+    # MTPL anchor: median of the per-group scale factors.
+    mtpl = arr[mtpl_i]
+    k_mtpl = mtpl / _REF_MTPL
+    n_ks = 1
+    k_lc = 0.0
+    if lc_gidx.size:
+        total = 0.0
+        for j in lc_gidx:
+            total += arr[j]
+        k_lc = total / lc_gidx.size / _REF_LC
+        n_ks += 1
+    k_c = 0.0
+    if c_gidx.size:
+        total = 0.0
+        for j in c_gidx:
+            total += arr[j]
+        k_c = total / c_gidx.size / _REF_C
+        n_ks += 1
+    if n_ks == 1:
+        k_ref = k_mtpl
+    elif n_ks == 2:
+        k_other = k_lc if lc_gidx.size else k_c
+        k_ref = 0.5 * (k_mtpl + k_other)
+    else:
+        k_ref = k_mtpl + k_lc + k_c - min(k_mtpl, k_lc, k_c) - max(k_mtpl, k_lc, k_c)
+    ratio = max(k_mtpl / k_ref, k_ref / k_mtpl)
+    if ratio > tau_outlier:
+        new_mtpl = _REF_MTPL * k_ref
+        if abs(new_mtpl - mtpl) > 1e-12:
+            arr[mtpl_i] = new_mtpl
+            changed = True
+
+    # Product minima: scale whole groups whose minimum fell to/below MTPL.
+    mtpl = arr[mtpl_i]
+    for gidx, ratio_ref in ((lc_gidx, RATIO_LC_OVER_MTPL), (c_gidx, RATIO_C_OVER_MTPL)):
+        if gidx.size == 0:
+            continue
+        current_min = arr[gidx[0]]
+        for j in gidx[1:]:
+            if arr[j] < current_min:
+                current_min = arr[j]
+        if current_min > mtpl:
+            continue
+        scale = ratio_ref * mtpl / current_min
+        for j in gidx:
+            arr[j] *= scale
+        changed = True
+
+    # LC < C per (variant, deductible) pair.
+    for n in range(lc_pair_i.size):
+        lc_price = arr[lc_pair_i[n]]
+        if arr[c_pair_i[n]] <= lc_price:
+            arr[c_pair_i[n]] = RATIO_C_OVER_LC * lc_price
+            changed = True
 
+    # Deductible ladders: rebuild violating rows from the 100 base.
+    for n in range(i100.size):
+        p100 = arr[i100[n]]
+        has200 = i200[n] >= 0
+        has500 = i500[n] >= 0
+        violates = has200 and p100 <= arr[i200[n]]
+        if not violates and has200 and has500:
+            violates = arr[i200[n]] <= arr[i500[n]]
+        if not violates:
+            continue
+        if has200:
+            arr[i200[n]] = _F200 * p100
+        if has500:
+            arr[i500[n]] = _F500 * p100
+        changed = True
+
+    # Variant ladders: rebuild violating rows from max(compact, basic).
+    for n in range(i_comfort.size):
+        base = max(arr[i_base[n, 0]], arr[i_base[n, 1]])
+        has_comfort = i_comfort[n] >= 0
+        has_premium = i_premium[n] >= 0
+        lower = arr[i_comfort[n]] if has_comfort else base
+        violates = has_comfort and arr[i_comfort[n]] <= base
+        if not violates and has_premium:
+            violates = arr[i_premium[n]] <= lower
+        if not violates:
+            continue
+        if has_comfort:
+            arr[i_comfort[n]] = _F_COMFORT * base
+        if has_premium:
+            arr[i_premium[n]] = _F_PREMIUM * base
+        changed = True
+
+    return changed
+
+
+class DefaultPriceFixer:
+    """
+        Applies deterministic repairs to a prices dict, one pass at a time.
+
+        There is a single implementation, so the fixer is dispatched directly;
+        alternative strategies can be passed to the engine as any object with
+        a compatible fix_pass(vec, parsed, report) method.
+    """
+
+    mtpl_key = MTPL_KEY
 
-class DefaultPriceFixer(BasePriceFixer):
     def __init__(self, tau_outlier: float = 5.0, eps: float = 1e-6, enable_mtpl_anchor: bool = True):
         self.tau_outlier = tau_outlier
         self.eps = eps
         self.enable_mtpl_anchor = enable_mtpl_anchor
+        # Cache slots hold the ParsedInput itself, not its id: the strong
+        # reference keeps the object alive, so a recycled id can never match
+        # a stale table. Hits compare with `is`.
+        self._mtpl_i_cache: Optional[Tuple[ParsedInput, int]] = None
+        self._ded_table_cache: Optional[Tuple[ParsedInput, _DedTable]] = None
+        self._var_table_cache: Optional[Tuple[ParsedInput, _VarTable]] = None
+        self._lc_c_cache: Optional[Tuple[ParsedInput, Tuple[np.ndarray, np.ndarray]]] = None
+        self._dirty_state: Optional[Tuple[ParsedInput, set]] = None
+        self._prev_touched: Optional[set] = None
+
+    def prepare(self, parsed: ParsedInput) -> None:
+        """
+            Warm all per-schema caches up front so the convergence loop runs
+            fix passes against precomputed tables only, and reset the dirty
+            frontier: parsed inputs are cached across solves by the engine,
+            so a new solve over the same schema must re-check every group.
+        """
+        self._dirty_state = None
+        self._mtpl_index(parsed)
+        self._ded_table(parsed)
+        self._var_table(parsed)
+        self._lc_c_pairs(parsed)
+
+    def _mtpl_index(self, parsed: ParsedInput) -> int:
+        """Position of the MTPL price in the flat array, cached per schema."""
+        cached = self._mtpl_i_cache
+        if cached is not None and cached[0] is parsed:
+            return cached[1]
+        mtpl_i = parsed.key_index.get(self.mtpl_key)
+        if mtpl_i is None:
+            # Same error the validator raises: the engine warms the fixer
+            # caches before the first validation, so this is the path a
+            # missing-mtpl input actually hits.
+            raise ValueError(f"Input must contain key '{self.mtpl_key}'.")
+        self._mtpl_i_cache = (parsed, mtpl_i)
+        return mtpl_i
+
+    def _lc_c_pairs(self, parsed: ParsedInput) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Parallel (limited_casco, casco) index arrays for the matching
+            (variant, deductible) pairs, cached per schema like the tables.
+        """
+        cached = self._lc_c_cache
+        if cached is not None and cached[0] is parsed:
+            return cached[1]
+        idx = parsed.key_index
+        arrays = (
+            np.array([idx[lc] for lc, _ in parsed.lc_c_pairs], dtype=np.intp),
+            np.array([idx[c] for _, c in parsed.lc_c_pairs], dtype=np.intp),
+        )
+        self._lc_c_cache = (parsed, arrays)
+        return arrays
+
+    def _ded_table(self, parsed: ParsedInput) -> _DedTable:
+        """
+            Parallel index arrays for the deductible ladders: one row per
+            (product, variant) group that has a 100 base, with -1 marking a
+            missing 200/500 slot. Cached per (parsed input, key order) so the
+            arrays are built once per solve.
+        """
+        cached = self._ded_table_cache
+        if cached is not None and cached[0] is parsed:
+            return cached[1]
+
+        # Groups without a 100 base cannot be rebuilt, and groups with only a
+        # 100 slot have no ladder to violate — neither gets a row.
+        groups = [
+            s for s in parsed.by_pv.values()
+            if s[0] is not None and (s[1] is not None or s[2] is not None)
+        ]
+        idx = parsed.key_index
+        table = _DedTable(
+            keys200=[k200 for _, k200, _ in groups],
+            keys500=[k500 for _, _, k500 in groups],
+            i100=np.array([idx[k100] for k100, _, _ in groups], dtype=np.intp),
+            i200=np.array([idx[k200] if k200 is not None else -1 for _, k200, _ in groups], dtype=np.intp),
+            i500=np.array([idx[k500] if k500 is not None else -1 for _, _, k500 in groups], dtype=np.intp),
+        )
+        self._ded_table_cache = (parsed, table)
+        return table
+
+    def _var_table(self, parsed: ParsedInput) -> _VarTable:
+        """
+            Parallel index arrays for the variant ladders: one row per
+            (product, deductible) group that has a compact/basic base. When one
+            base variant is missing its index is duplicated so the row maximum
+            still yields the base price. Cached like the deductible table.
+        """
+        cached = self._var_table_cache
+        if cached is not None and cached[0] is parsed:
+            return cached[1]
+
+        # Rows need both a compact/basic base to rebuild from and at least one
+        # upper variant to check; base-only groups are filtered out up front.
+        groups = [
+            s for s in parsed.by_pd.values()
+            if (s[0] is not None or s[1] is not None) and (s[2] is not None or s[3] is not None)
+        ]
+        idx = parsed.key_index
+        i_base = np.array(
+            [
+                [idx[compact or basic], idx[basic or compact]]
+                for compact, basic, _, _ in groups
+            ],
+            dtype=np.intp,
+        ).reshape(len(groups), 2)
+        table = _VarTable(
+            keys_comfort=[comfort for _, _, comfort, _ in groups],
+            keys_premium=[premium for _, _, _, premium in groups],
+            i_base=i_base,
+            i_comfort=np.array([idx[comfort] if comfort is not None else -1 for _, _, comfort, _ in groups], dtype=np.intp),
+            i_premium=np.array([idx[premium] if premium is not None else -1 for _, _, _, premium in groups], dtype=np.intp),
+        )
+        self._var_table_cache = (parsed, table)
+        return table
+
+    def fix_pass(self, vec: PriceVec, parsed: ParsedInput, report: FixReport) -> bool:
+        # With logging off the pass has no observable side channel, so it can
+        # run through the compiled kernel when numba is importable.
+        if _HAVE_NUMBA and not report.enabled:
+            lc_pair_i, c_pair_i = self._lc_c_pairs(parsed)
+            ded = self._ded_table(parsed)
+            var = self._var_table(parsed)
+            changed = _fix_pass_kernel(
+                vec.arr,
+                self._mtpl_index(parsed),
+                parsed.product_idx[Product.LIMITED_CASCO],
+                parsed.product_idx[Product.CASCO],
+                lc_pair_i,
+                c_pair_i,
+                ded.i100,
+                ded.i200,
+                ded.i500,
+                var.i_base,
+                var.i_comfort,
+                var.i_premium,
+                # an infinite threshold makes the anchor rule unreachable
+                self.tau_outlier if self.enable_mtpl_anchor else np.inf,
+            )
+            self._dirty_state = None  # the kernel does not track touched indices
+            return changed
+        # Dirty frontier from the previous pass of the same solve; None means
+        # everything must be checked (first pass of a new parsed input).
+        state = self._dirty_state
+        self._prev_touched = state[1] if state is not None and state[0] is parsed else None
+        vec.touched = set()
+        changed = self.enforce_all(vec, parsed, report)
+        self._dirty_state = (parsed, vec.touched)
+        return changed
 
-    def fix_pass(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
+    def _dirty_rows(self, vec: PriceVec, index_arrays: Tuple[np.ndarray, ...]) -> Optional[np.ndarray]:
+        """
+            Boolean mask of rows whose prices may have changed since the last
+            check, or None when every row must be (re-)checked. A row is dirty
+            if any of its indices was written in the previous pass or earlier
+            in the current one; untouched rows were already verified clean.
+        """
+        prev = self._prev_touched
+        if prev is None:
+            return None
+        dirty_set = prev | vec.touched
+        if not dirty_set:
+            return np.zeros(index_arrays[0].shape[0], dtype=bool)
+        dirty_idx = np.fromiter(dirty_set, dtype=np.intp, count=len(dirty_set))
+        mask = np.isin(index_arrays[0], dirty_idx)
+        for ia in index_arrays[1:]:
+            mask |= np.isin(ia, dirty_idx)
+        return mask
+
+    def enforce_all(self, vec: PriceVec, parsed: ParsedInput, report: FixReport) -> bool:
+        """
+            Run all rules, in order, against the shared price vector.
+
+            Each rule still walks its own precomputed index table, but they
+            all read and write the same in-memory array snapshot, so no rule
+            re-reads the dict or rebuilds its groupings between passes.
+        """
         changed = False
         if self.enable_mtpl_anchor:
-            changed |= self.set_mtpl_anchor(prices, items, report)
-        changed |= self.enforce_product_type_order(prices, items, report)
-        changed |= self.enforce_deductible_order(prices, items, report)
-        changed |= self.enforce_variant_order(prices, items, report)
+            changed |= self.set_mtpl_anchor(vec, parsed, report)
+        changed |= self.enforce_product_minima_ratios(vec, parsed, report)
+        changed |= self.enforce_limited_casco_less_than_casco(vec, parsed, report)
+        changed |= self.enforce_deductible_order(vec, parsed, report)
+        changed |= self.enforce_variant_order(vec, parsed, report)
         return changed
 
-    def set_mtpl_anchor(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
+    def set_mtpl_anchor(self, vec: PriceVec, parsed: ParsedInput, report: FixReport) -> bool:
         """
             Set MTPL as the anchor reference unless it is an outlier relative to
             the implied scaling level of the other product groups.
@@ -59,43 +443,43 @@ class DefaultPriceFixer(BasePriceFixer):
             replace mtpl with:
                 mtpl := avg_mtpl * k_ref
         """
-        by_product = keys_by_product(items)
-
-        mtpl_key = Product.MTPL.key
-        mtpl = float(prices[mtpl_key])
+        mtpl_i = self._mtpl_index(parsed)
+        mtpl = vec.arr[mtpl_i]
 
-        k_mtpl = mtpl / REFERENCE_AVG_PRICE[Product.MTPL]
+        k_mtpl = mtpl / _REF_MTPL
         ks = [k_mtpl]
 
-        lc_keys = by_product.get(Product.LIMITED_CASCO, [])
-        if lc_keys:
-            lc_mean = sum(float(prices[k]) for k in lc_keys) / len(lc_keys)
-            ks.append(lc_mean / REFERENCE_AVG_PRICE[Product.LIMITED_CASCO])
-
-        c_keys = by_product.get(Product.CASCO, [])
-        if c_keys:
-            c_mean = sum(float(prices[k]) for k in c_keys) / len(c_keys)
-            ks.append(c_mean / REFERENCE_AVG_PRICE[Product.CASCO])
-
-        k_ref = median(ks)
+        lc_idx = parsed.product_idx[Product.LIMITED_CASCO]
+        if lc_idx.size:
+            ks.append(vec.arr[lc_idx].mean() / _REF_LC)
+
+        c_idx = parsed.product_idx[Product.CASCO]
+        if c_idx.size:
+            ks.append(vec.arr[c_idx].mean() / _REF_C)
+
+        # Inline median: ks has 1-3 entries (MTPL always contributes one),
+        # so statistics.median would be pure overhead here. The 3-element
+        # case uses the branchless sum-minus-extremes form instead of a sort.
+        if len(ks) == 1:
+            k_ref = ks[0]
+        elif len(ks) == 2:
+            k_ref = 0.5 * (ks[0] + ks[1])
+        else:
+            a, b, c = ks
+            k_ref = a + b + c - min(a, b, c) - max(a, b, c)
         ratio = max(k_mtpl / k_ref, k_ref / k_mtpl)  # prices assumed positive
 
         if ratio > self.tau_outlier:
-            new_mtpl = REFERENCE_AVG_PRICE[Product.MTPL] * k_ref
+            new_mtpl = _REF_MTPL * k_ref
             if abs(new_mtpl - mtpl) > 1e-12:
-                prices[mtpl_key] = float(new_mtpl)
-                report.log(f"[anchor] mtpl {mtpl:.6f} -> {new_mtpl:.6f} (ratio={ratio:.3f})")
+                vec.arr[mtpl_i] = new_mtpl
+                vec.touched.add(mtpl_i)
+                report.log("[anchor] mtpl %.6f -> %.6f (ratio=%.3f)", mtpl, new_mtpl, ratio)
                 return True
 
         return False
 
-    def enforce_product_type_order(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
-        changed = False
-        changed |= self.enforce_product_minima_ratios(prices, items, report)
-        changed |= self.enforce_limited_casco_less_than_casco(prices, items, report)
-        return changed
-
-    def enforce_product_minima_ratios(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
+    def enforce_product_minima_ratios(self, vec: PriceVec, parsed: ParsedInput, report: FixReport) -> bool:
         """
             Enforce product-type ordering relative to MTPL.
 
@@ -112,36 +496,39 @@ class DefaultPriceFixer(BasePriceFixer):
                 relative price differences within that product group.
         """
         changed = False
-        mtpl = float(prices[Product.MTPL.key])
-        by_product = keys_by_product(items)
+        mtpl = vec.arr[self._mtpl_index(parsed)]
 
         for product, ratio in (
             (Product.LIMITED_CASCO, RATIO_LC_OVER_MTPL),
             (Product.CASCO, RATIO_C_OVER_MTPL),
         ):
-            keys = by_product.get(product, [])
-            if not keys:
+            gidx = parsed.product_idx[product]
+            if gidx.size == 0:
                 continue
 
-            current_min = min(float(prices[k]) for k in keys)
+            # One gather serves both the min check and the scaled writeback.
+            vals = vec.arr[gidx]
+            current_min = vals.min()
             if current_min > mtpl:
                 continue  # ordering ok => do nothing
 
             target_min = ratio * mtpl
             scale = target_min / current_min
 
-            for k in keys:
-                prices[k] = float(prices[k]) * scale
+            vec.arr[gidx] = vals * scale
+            vec.touched.update(gidx.tolist())
 
             report.log(
-                f"[product-min] scaled {product.key} by {scale:.6f} "
-                f"(min {current_min:.6f} -> {target_min:.6f})"
+                "[product-min] scaled %s by %.6f (min %.6f -> %.6f)",
+                product.value, scale, current_min, target_min,
             )
             changed = True
 
         return changed
 
-    def enforce_limited_casco_less_than_casco(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
+    def enforce_limited_casco_less_than_casco(
+        self, vec: PriceVec, parsed: ParsedInput, report: FixReport, _ratio: float = RATIO_C_OVER_LC
+    ) -> bool:
         """
             Enforce product ordering between Limited Casco and Casco for matching
             (variant, deductible) combinations.
@@ -155,29 +542,28 @@ class DefaultPriceFixer(BasePriceFixer):
                     casco(v, d) := RATIO_C_OVER_LC * limited_casco(v, d)
         """
         changed = False
-        grouped = group_by_variant_and_deductible(items)
-
-        for (_variant, _deductible), m in grouped.items():
-            if Product.LIMITED_CASCO not in m or Product.CASCO not in m:
-                continue
+        arr = vec.arr
+        idx = vec.idx
 
-            lc_key = m[Product.LIMITED_CASCO]
-            c_key = m[Product.CASCO]
-
-            lc_price = float(prices[lc_key])
-            c_price = float(prices[c_key])
+        for lc_key, c_key in parsed.lc_c_pairs:
+            c_i = idx[c_key]
+            lc_price = arr[idx[lc_key]]
+            c_price = arr[c_i]
 
             if c_price > lc_price:
                 continue  # ordering ok => do nothing
 
-            target = RATIO_C_OVER_LC * lc_price
-            prices[c_key] = float(target)
-            report.log(f"[product] {c_key}: {c_price:.6f} -> {target:.6f} (rebase vs {lc_key})")
+            target = _ratio * lc_price
+            arr[c_i] = target
+            vec.touched.add(c_i)
+            report.log("[product] %s: %.6f -> %.6f (rebase vs %s)", c_key, c_price, target, lc_key)
             changed = True
 
         return changed
 
-    def enforce_deductible_order(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
+    def enforce_deductible_order(
+        self, vec: PriceVec, parsed: ParsedInput, report: FixReport, _f200: float = _F200, _f500: float = _F500
+    ) -> bool:
         """
             Enforce deductible monotonicity within each (product, variant).
 
@@ -188,42 +574,49 @@ class DefaultPriceFixer(BasePriceFixer):
                 Rebuild the deductible ladder from the price(100) base using:
                     price(200) := DEDUCTIBLE_FACTOR[D200] * price(100)
                     price(500) := DEDUCTIBLE_FACTOR[D500] * price(100)
-        """
-        changed = False
-        grouped = group_by_product_and_variant(items)
 
-        for (_product, _variant), m in grouped.items():
-            if Deductible.D100 not in m:
-                continue
-
-            p100 = float(prices[m[Deductible.D100]])
-
-            violates = False
-            if Deductible.D200 in m and (p100 <= float(prices[m[Deductible.D200]])):
-                violates = True
-            if (
-                Deductible.D200 in m
-                and Deductible.D500 in m
-                and (float(prices[m[Deductible.D200]]) <= float(prices[m[Deductible.D500]]))
-            ):
-                violates = True
-
-            if not violates:
+            All ladders are checked and rebuilt at once via boolean masks over
+            the parallel index arrays instead of a per-group Python loop.
+        """
+        t = self._ded_table(parsed)
+        if t.i100.size == 0:
+            return False
+
+        arr = vec.arr
+        p100 = arr[t.i100]
+        has200 = t.i200 >= 0
+        has500 = t.i500 >= 0
+        # -inf sentinels make missing slots unable to trigger a violation.
+        p200 = np.where(has200, arr[t.i200], -np.inf)
+        p500 = np.where(has500, arr[t.i500], -np.inf)
+
+        violates = (has200 & (p100 <= p200)) | (has200 & has500 & (p200 <= p500))
+        dirty = self._dirty_rows(vec, (t.i100, t.i200, t.i500))
+        if dirty is not None:
+            violates &= dirty
+        if not violates.any():
+            return False
+
+        # Rebuild every violating ladder from its 100 base.
+        for keys, i_d, has_d, p_d, factor in (
+            (t.keys200, t.i200, has200, p200, _f200),
+            (t.keys500, t.i500, has500, p500, _f500),
+        ):
+            mask = violates & has_d
+            rows = np.nonzero(mask)[0]
+            if rows.size == 0:
                 continue
+            targets = factor * p100[mask]
+            arr[i_d[mask]] = targets
+            vec.touched.update(i_d[mask].tolist())
+            for row, target in zip(rows.tolist(), targets.tolist()):
+                report.log("[deductible] %s: %.6f -> %.6f", keys[row], p_d[row], target)
 
-            # Fix entire ladder from 100 base
-            for d in (Deductible.D200, Deductible.D500):
-                if d not in m:
-                    continue
-                target = DEDUCTIBLE_FACTOR[d] * p100
-                old = float(prices[m[d]])
-                prices[m[d]] = float(target)
-                report.log(f"[deductible] {m[d]}: {old:.6f} -> {target:.6f}")
-                changed = True
+        return True
 
-        return changed
-
-    def enforce_variant_order(self, prices: Dict[str, float], items: List[PricingItem], report: FixReport) -> bool:
+    def enforce_variant_order(
+        self, vec: PriceVec, parsed: ParsedInput, report: FixReport, _fc: float = _F_COMFORT, _fp: float = _F_PREMIUM
+    ) -> bool:
         """
             Enforce variant monotonicity within each (product, deductible).
 
@@ -236,41 +629,39 @@ class DefaultPriceFixer(BasePriceFixer):
                     comfort := VARIANT_FACTOR[COMFORT] * base
                     premium := VARIANT_FACTOR[PREMIUM] * base
         """
-        changed = False
-        grouped = group_by_product_and_deductible(items)
-
-        for (_product, _deductible), m in grouped.items():
-            base_keys = [m[v] for v in (Variant.COMPACT, Variant.BASIC) if v in m]
-            if not base_keys:
-                continue
-
-            base = max(float(prices[k]) for k in base_keys)
-
-            violates = False
-            if Variant.COMFORT in m and (float(prices[m[Variant.COMFORT]]) <= base):
-                violates = True
-
-            if Variant.PREMIUM in m:
-                lower = float(prices[m[Variant.COMFORT]]) if Variant.COMFORT in m else base
-                if (float(prices[m[Variant.PREMIUM]]) <= lower):
-                    violates = True
-
-            if not violates:
+        t = self._var_table(parsed)
+        if t.i_base.size == 0:
+            return False
+
+        arr = vec.arr
+        base = arr[t.i_base].max(axis=1)
+        has_comfort = t.i_comfort >= 0
+        has_premium = t.i_premium >= 0
+        p_comfort = np.where(has_comfort, arr[t.i_comfort], np.inf)
+        p_premium = np.where(has_premium, arr[t.i_premium], np.inf)
+        # premium is checked against comfort when present, else against base
+        lower = np.where(has_comfort, p_comfort, base)
+
+        violates = (has_comfort & (p_comfort <= base)) | (has_premium & (p_premium <= lower))
+        dirty = self._dirty_rows(vec, (t.i_base[:, 0], t.i_base[:, 1], t.i_comfort, t.i_premium))
+        if dirty is not None:
+            violates &= dirty
+        if not violates.any():
+            return False
+
+        # Rebuild every violating variant ladder from its base.
+        for keys, i_v, has_v, p_v, factor in (
+            (t.keys_comfort, t.i_comfort, has_comfort, p_comfort, _fc),
+            (t.keys_premium, t.i_premium, has_premium, p_premium, _fp),
+        ):
+            mask = violates & has_v
+            rows = np.nonzero(mask)[0]
+            if rows.size == 0:
                 continue
+            targets = factor * base[mask]
+            arr[i_v[mask]] = targets
+            vec.touched.update(i_v[mask].tolist())
+            for row, target in zip(rows.tolist(), targets.tolist()):
+                report.log("[variant] %s: %.6f -> %.6f", keys[row], p_v[row], target)
 
-            # Fix entire ladder from base
-            if Variant.COMFORT in m:
-                old = float(prices[m[Variant.COMFORT]])
-                target = VARIANT_FACTOR[Variant.COMFORT] * base
-                prices[m[Variant.COMFORT]] = float(target)
-                report.log(f"[variant] {m[Variant.COMFORT]}: {old:.6f} -> {target:.6f}")
-                changed = True
-
-            if Variant.PREMIUM in m:
-                old = float(prices[m[Variant.PREMIUM]])
-                target = VARIANT_FACTOR[Variant.PREMIUM] * base
-                prices[m[Variant.PREMIUM]] = float(target)
-                report.log(f"[variant] {m[Variant.PREMIUM]}: {old:.6f} -> {target:.6f}")
-                changed = True
-
-        return changed
+        return True
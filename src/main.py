@@ -1,11 +1,25 @@
 from __future__ import annotations
 
-from typing import Dict
+import sys
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple
 
-from src.core import FixResult, FixReport
+import numpy as np
+
+from src.core import FixResult, FixReport, ParsedInput
 from src.parser import DefaultPriceParser, BasePriceParser
 from src.validator import DefaultPriceValidator, BasePriceValidator
-from src.fixer import DefaultPriceFixer, BasePriceFixer
+from src.fixer import DefaultPriceFixer, PriceVec
+
+
+def _copy_report(report: FixReport) -> FixReport:
+    """Fresh FixReport with copied lists, so callers cannot mutate a cached one."""
+    return FixReport(
+        violations_before=list(report.violations_before),
+        violations_after=list(report.violations_after),
+        fix_log=list(report.fix_log),
+        enabled=report.enabled,
+    )
 
 
 class PricingEngine:
@@ -13,7 +27,7 @@ class PricingEngine:
         self,
         parser: BasePriceParser = DefaultPriceParser(),
         validator: BasePriceValidator = DefaultPriceValidator(),
-        fixer: BasePriceFixer = DefaultPriceFixer(),
+        fixer: DefaultPriceFixer = DefaultPriceFixer(),
         *,
         max_iterations: int = 10,
     ):
@@ -21,30 +35,171 @@ class PricingEngine:
         self.validator = validator 
         self.fixer = fixer 
         self.max_iterations = max_iterations
-
-    def validate_and_fix(self, prices: Dict[str, float]) -> FixResult:
-        prices = {k: float(v) for k, v in prices.items()}
-        items = self.parser.parse_all(prices)
-
-        report = FixReport()
-        report.violations_before = self.validator.validate(prices, items)
+        # Parsed schemas keyed by the input's key set: batch callers reuse the
+        # same 25 keys across calls, so parsing collapses to one dict lookup.
+        self._parsed_cache: "OrderedDict[frozenset, ParsedInput]" = OrderedDict()
+        # Full solves keyed by a quantized price fingerprint: repeated inputs
+        # (retries, idempotent re-scoring) skip the solve entirely.
+        self._result_cache: "OrderedDict[tuple, FixResult]" = OrderedDict()
+
+    _PARSED_CACHE_SIZE = 32
+    _RESULT_CACHE_SIZE = 256
+
+    def _parse_cached(self, prices: Dict[str, float]) -> ParsedInput:
+        keyset = frozenset(prices)
+        parsed = self._parsed_cache.get(keyset)
+        if parsed is None:
+            parsed = self.parser.parse_input(prices)
+            self._parsed_cache[keyset] = parsed
+            if len(self._parsed_cache) > self._PARSED_CACHE_SIZE:
+                self._parsed_cache.popitem(last=False)
+        else:
+            self._parsed_cache.move_to_end(keyset)
+        return parsed
+
+    def validate_and_fix(
+        self,
+        prices: Dict[str, float],
+        *,
+        out: "Dict[str, float] | None" = None,
+        log_fixes: bool = True,
+    ) -> FixResult:
+        """
+            Validate and repair `prices`, returning a FixResult. When `out` is
+            given the fixed prices are written into that dict in place (after
+            clearing it) and it becomes the result's fixed_prices, letting
+            callers reuse one buffer across many solves. With log_fixes=False
+            the report skips fix_log formatting entirely and the fix passes
+            may run through the compiled kernel; the violation lists are
+            still populated.
+        """
+        # Interning aligns these keys with the ones stored by the parser, so
+        # every later lookup short-circuits on object identity.
+        prices = {sys.intern(k): float(v) for k, v in prices.items()}
+        parsed = self._parse_cached(prices)
+
+        # Exact keys plus values quantized to 9 decimals identify a solve.
+        # log_fixes is part of the fingerprint: the same prices solved with
+        # logging on and off produce different reports.
+        sig = (parsed.keys, log_fixes, tuple(round(prices[k], 9) for k in parsed.keys))
+        cached = self._result_cache.get(sig)
+        if cached is not None:
+            self._result_cache.move_to_end(sig)
+            # Fresh dict (or the caller's buffer) so mutations cannot poison the cache.
+            if out is None:
+                fixed = dict(cached.fixed_prices)
+            else:
+                out.clear()
+                out.update(cached.fixed_prices)
+                fixed = out
+            return FixResult(fixed, cached.converged, cached.iterations, _copy_report(cached.report))
+
+        self.fixer.prepare(parsed)
+        # Single flat array for the whole solve; the dict is rebuilt once at
+        # the end instead of being scattered back after every fix pass.
+        vec = PriceVec(prices, parsed)
+
+        # One attribute walk for the loop bodies instead of one per call.
+        _validate = self.validator.validate
+        _has = self.validator.has_violations
+        _fix = self.fixer.fix_pass
+
+        report = FixReport(enabled=log_fixes)
+        report.violations_before = _validate(vec, parsed)
 
         converged = False
         iterations_used = 0
 
-        for iteration in range(1, self.max_iterations + 1):
-            iterations_used = iteration
-            current = self.validator.validate(prices, items)
-            # nothing to validate
-            if not current:
+        if not report.violations_before:
+            # The validation probe counts as the single pass, matching the
+            # batch API (and the baseline), which reports 1 for clean rows.
+            converged = True
+            iterations_used = 1
+        else:
+            # The rules are ordered so one pass (anchor, product minima,
+            # LC < C, deductible, variant) normally repairs everything:
+            # later rules only push prices upward from bases the earlier
+            # rules have already settled. Inner checks use the boolean
+            # has_violations probe; Violation objects are only built for
+            # the before/after reports.
+            _fix(vec, parsed, report)
+            iterations_used = 1
+            if not _has(vec, parsed):
                 converged = True
-                break
-            # nothing to fix
-            if not self.fixer.fix_pass(prices, items, report):
-                break
-
-        report.violations_after = self.validator.validate(prices, items)
-        return FixResult(prices, converged, iterations_used, report)
+            else:
+                # Rare: a repair re-broke an earlier rule (e.g. a rebuilt
+                # LC ladder rising above Casco); iterate to the fixed point.
+                report.log("[engine] single pass left violations; iterating")
+                for iteration in range(2, self.max_iterations + 1):
+                    iterations_used = iteration
+                    if not _fix(vec, parsed, report):
+                        break
+                    if not _has(vec, parsed):
+                        converged = True
+                        break
+
+        # A converged solve is violation-free by construction; only the
+        # rare non-converged exit pays for one more full validation.
+        report.violations_after = [] if converged else _validate(vec, parsed)
+        vec.writeback(prices)
+        if out is not None:
+            out.clear()
+            out.update(prices)
+            prices = out
+        result = FixResult(prices, converged, iterations_used, report)
+        self._result_cache[sig] = FixResult(dict(prices), converged, iterations_used, _copy_report(report))
+        if len(self._result_cache) > self._RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        return result
+
+    def validate_and_fix_batch(
+        self, matrix: np.ndarray, columns: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+            Fix N price vectors stacked as rows of an (N, K) float array whose
+            columns follow `columns`. The schema is parsed and the fixer tables
+            are built once for the whole batch; each row then runs the same
+            convergence loop in place over its slice of the output matrix, so
+            the per-call parse/setup cost is amortized across all rows. Rows
+            converge independently, which is why the loop is per-row rather
+            than broadcast across the batch axis.
+
+            Returns (fixed_matrix, converged_mask, iterations_per_row).
+        """
+        parsed = self._parse_cached(dict.fromkeys(columns, 0.0))
+        fixed = np.array(matrix, dtype=np.float64, copy=True)
+        if fixed.ndim != 2 or fixed.shape[1] != len(parsed.keys):
+            raise ValueError(f"Expected a (N, {len(parsed.keys)}) matrix, got {fixed.shape}.")
+        # A cached schema may list the same keys in a different order than
+        # `columns`; permute into key order for the index tables if needed.
+        perm = np.fromiter(map(parsed.key_index.__getitem__, columns), dtype=np.intp, count=len(parsed.keys))
+        identity = np.array_equal(perm, np.arange(perm.size))
+        work = fixed if identity else np.empty_like(fixed)
+        if not identity:
+            work[:, perm] = fixed
+
+        n_rows = work.shape[0]
+        converged = np.zeros(n_rows, dtype=bool)
+        iterations = np.zeros(n_rows, dtype=np.intp)
+        report = FixReport(enabled=False)  # batch path keeps no per-row fix log
+        _has = self.validator.has_violations
+        _fix = self.fixer.fix_pass
+        _prepare = self.fixer.prepare
+
+        for row in range(n_rows):
+            _prepare(parsed)
+            vec = PriceVec.from_array(work[row], parsed)
+            for iteration in range(1, self.max_iterations + 1):
+                iterations[row] = iteration
+                if not _has(vec, parsed):
+                    converged[row] = True
+                    break
+                if not _fix(vec, parsed, report):
+                    break
+
+        if not identity:
+            fixed = work[:, perm]  # back to the caller's column order
+        return fixed, converged, iterations
 
 
 if __name__ == "__main__":
@@ -1,25 +1,85 @@
 from __future__ import annotations
 
 import re
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from functools import lru_cache
+from itertools import product as iter_product
+from typing import Dict, List, Optional, Tuple
 
 from src.core import (
+    ParsedInput,
     PricingItem,
+    build_parsed_input,
     Product,
     Variant,
     Deductible,
-    VALID_PRODUCTS,
-    VALID_VARIANTS,
-    VALID_DEDUCTIBLES,
 )
 
+# The schema is closed (2 products x 4 variants x 3 deductibles, plus mtpl),
+# so every valid canonical key is enumerable at import time. One dict lookup
+# then replaces the regex match and the three Enum coercions per key.
+KEY_TABLE: Dict[str, Tuple[Product, Optional[Variant], Optional[Deductible]]] = {
+    f"{p.value}_{v.value}_{d.value}": (p, v, d)
+    for p, v, d in iter_product((Product.LIMITED_CASCO, Product.CASCO), Variant, Deductible)
+}
+KEY_TABLE[Product.MTPL.value] = (Product.MTPL, None, None)
+
+# Keys are lower-cased before matching, so IGNORECASE is unnecessary, and
+# fullmatch makes the ^...$ anchors redundant. One pattern covers the whole
+# grammar, mtpl included, and every alternation is closed, so a match
+# guarantees all components are valid (group 1 is None for mtpl).
+_KEY_PATTERN = re.compile(
+    r"(?:mtpl|(limited_casco|casco)_(compact|basic|comfort|premium)_(100|200|500))"
+)
+
+
+def _parse_key_slow(key: str, k: str) -> PricingItem:
+    m = _KEY_PATTERN.fullmatch(k)
+    if not m:
+        raise ValueError(f"Invalid key format: {key}")
+
+    prod_str, var_str, ded_str = m.groups()
+    if prod_str is None:
+        return PricingItem(key=key, product=Product.MTPL, variant=None, deductible=None)
+    return PricingItem(
+        key=key,
+        product=Product(prod_str),
+        variant=Variant(var_str),
+        deductible=Deductible(int(ded_str)),
+    )
+
+
+@lru_cache(maxsize=128)
+def _parse_key_cached(key: str) -> PricingItem:
+    """
+        Resolve one key to its (shared, frozen) PricingItem. The key alphabet
+        is tiny and stable across engine calls, so after the first solve every
+        lookup is a cache hit.
+    """
+    # Interned keys let later dict probes hit the identity shortcut
+    # instead of re-hashing and comparing the string contents.
+    key = sys.intern(key)
+    k = key.lower().strip()
+
+    entry = KEY_TABLE.get(k)
+    if entry is not None:
+        product, variant, deductible = entry
+        return PricingItem(key=key, product=product, variant=variant, deductible=deductible)
+
+    # Not a valid canonical key: run the regex path for a precise error.
+    return _parse_key_slow(key, k)
+
 
 class BasePriceParser(ABC):
     @abstractmethod
     def parse_all(self, prices: Dict[str, float]) -> List[PricingItem]:
         raise NotImplementedError
 
+    def parse_input(self, prices: Dict[str, float]) -> ParsedInput:
+        """Parse all keys and precompute the groupings in one go."""
+        return build_parsed_input(self.parse_all(prices))
+
 
 class DefaultPriceParser(BasePriceParser):
     """
@@ -32,49 +92,10 @@ class DefaultPriceParser(BasePriceParser):
         deductible in {100, 200, 500}
     """
 
-    pattern = re.compile(
-        r"^(limited_casco|casco)_(compact|basic|comfort|premium)_(\d+)$",
-        re.IGNORECASE,
-    )
+    pattern = _KEY_PATTERN  # fallback matcher, kept addressable for subclasses
 
     def parse_key(self, key: str) -> PricingItem:
-        k = key.lower().strip()
-
-        if k == Product.MTPL.key:
-            return PricingItem(key=key, product=Product.MTPL, variant=None, deductible=None)
-
-        m = self.pattern.match(k)
-        if not m:
-            raise ValueError(f"Invalid key format: {key}")
-
-        prod_str, var_str, ded_str = m.groups()
-        ded_int = int(ded_str)
-
-        # Convert to Enums
-        try:
-            product = Product(prod_str)
-        except ValueError as e:
-            raise ValueError(f"Invalid product in key {key}: {prod_str}") from e
-
-        try:
-            variant = Variant(var_str)
-        except ValueError as e:
-            raise ValueError(f"Invalid variant in key {key}: {var_str}") from e
-
-        try:
-            deductible = Deductible(ded_int)
-        except ValueError as e:
-            raise ValueError(f"Invalid deductible in key {key}: {ded_int}") from e
-
-        # Defensive checks (keeps your previous structure)
-        if product not in VALID_PRODUCTS:
-            raise ValueError(f"Invalid product in key {key}: {product}")
-        if variant not in VALID_VARIANTS:
-            raise ValueError(f"Invalid variant in key {key}: {variant}")
-        if deductible not in VALID_DEDUCTIBLES:
-            raise ValueError(f"Invalid deductible in key {key}: {deductible}")
-
-        return PricingItem(key=key, product=product, variant=variant, deductible=deductible)
+        return _parse_key_cached(key)
 
     def parse_all(self, prices: Dict[str, float]) -> List[PricingItem]:
         return [self.parse_key(k) for k in prices.keys()]
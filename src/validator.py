@@ -1,26 +1,28 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import List, Mapping
 
 from src.core import (
-    PricingItem,
+    ParsedInput,
     Violation,
     Product,
-    Variant,
-    Deductible,
-    keys_by_product,
-    group_by_product_and_variant,
-    group_by_product_and_deductible,
-    group_by_variant_and_deductible,
+    MTPL_KEY,
 )
 
 
 class BasePriceValidator(ABC):
     @abstractmethod
-    def validate(self, prices: Dict[str, float], items: List[PricingItem]) -> List[Violation]:
+    def validate(self, prices: Mapping[str, float], parsed: ParsedInput) -> List[Violation]:
         raise NotImplementedError
 
+    def has_violations(self, prices: Mapping[str, float], parsed: ParsedInput) -> bool:
+        """
+            Convergence probe: subclasses may override with an early-returning
+            check that allocates no Violation objects.
+        """
+        return bool(self.validate(prices, parsed))
+
 
 class DefaultPriceValidator(BasePriceValidator):
     """
@@ -28,45 +30,46 @@ class DefaultPriceValidator(BasePriceValidator):
         Does not modify prices.
     """
 
-    def validate(self, prices: Dict[str, float], items: List[PricingItem]) -> List[Violation]:
-        p = {k: float(v) for k, v in prices.items()}
+    def validate(self, prices: Mapping[str, float], parsed: ParsedInput) -> List[Violation]:
+        # The engine normalizes values to float once up front; `prices` is any
+        # keyed float view (a plain dict or the solver's PriceVec) and is read
+        # directly instead of being rebuilt into a cast copy per call.
+        p = prices
         violations: List[Violation] = []
 
         # Product-level: MTPL must be cheaper than both groups' minima 
-        mtpl_key = Product.MTPL.key
+        mtpl_key = MTPL_KEY
         if mtpl_key not in p:
             raise ValueError(f"Input must contain key '{mtpl_key}'.")
 
         mtpl = p[mtpl_key]
-        by_product = keys_by_product(items)
+        by_product = parsed.by_product
+        getter = p.__getitem__  # bound C getter: no Python frame per element
 
         for prod in (Product.LIMITED_CASCO, Product.CASCO):
             keys = by_product.get(prod, [])
             if not keys:
                 continue
-            group_min = min(p[k] for k in keys)
+            group_min = min(map(getter, keys))
             if not (mtpl < group_min):
                 violations.append(
                     Violation(
                         category="product",
-                        rule=f"{mtpl_key} < min({prod.key})",
-                        message=f"{mtpl_key} must be cheaper than the cheapest policy in {prod.key}.",
+                        rule=f"{mtpl_key} < min({prod.value})",
+                        message=f"{mtpl_key} must be cheaper than the cheapest policy in {prod.value}.",
                         left_key=mtpl_key,
-                        right_key=f"min({prod.key})",
+                        right_key=f"min({prod.value})",
                         left_value=mtpl,
                         right_value=group_min,
                     )
                 )
 
         # Product-level: LIMITED_CASCO(v,d) < CASCO(v,d) for matching (variant, deductible) ---
-        for (_variant, _deductible), m in group_by_variant_and_deductible(items).items():
-            if Product.LIMITED_CASCO not in m or Product.CASCO not in m:
-                continue
+        for lc_key, c_key in parsed.lc_c_pairs:
+            lc_price = getter(lc_key)
+            c_price = getter(c_key)
 
-            lc_key = m[Product.LIMITED_CASCO]
-            c_key = m[Product.CASCO]
-
-            if not (p[lc_key] < p[c_key]):
+            if not (lc_price < c_price):
                 violations.append(
                     Violation(
                         category="product",
@@ -74,83 +77,128 @@ class DefaultPriceValidator(BasePriceValidator):
                         message="Limited Casco must be cheaper than Casco for same variant & deductible.",
                         left_key=lc_key,
                         right_key=c_key,
-                        left_value=p[lc_key],
-                        right_value=p[c_key],
+                        left_value=lc_price,
+                        right_value=c_price,
                     )
                 )
 
         # Deductible-level: within (product, variant): 100 > 200 > 500 ---
-        for (prod, var), m in group_by_product_and_variant(items).items():
-            if Deductible.D100 in m and Deductible.D200 in m:
-                k100 = m[Deductible.D100]
-                k200 = m[Deductible.D200]
-                if not (p[k100] > p[k200]):
-                    violations.append(
-                        Violation(
-                            category="deductible",
-                            rule="100 > 200",
-                            message=f"{prod.key}_{var.key}: 100 must be more expensive than 200.",
-                            left_key=k100,
-                            right_key=k200,
-                            left_value=p[k100],
-                            right_value=p[k200],
-                        )
+        for (prod, var), (k100, k200, k500) in parsed.by_pv.items():
+            # Fetch each slot once; both comparisons then run on local floats.
+            v100 = getter(k100) if k100 is not None else None
+            v200 = getter(k200) if k200 is not None else None
+            v500 = getter(k500) if k500 is not None else None
+
+            if v100 is not None and v200 is not None and not (v100 > v200):
+                violations.append(
+                    Violation(
+                        category="deductible",
+                        rule="100 > 200",
+                        message=f"{prod.value}_{var.value}: 100 must be more expensive than 200.",
+                        left_key=k100,
+                        right_key=k200,
+                        left_value=v100,
+                        right_value=v200,
                     )
+                )
 
-            if Deductible.D200 in m and Deductible.D500 in m:
-                k200 = m[Deductible.D200]
-                k500 = m[Deductible.D500]
-                if not (p[k200] > p[k500]):
-                    violations.append(
-                        Violation(
-                            category="deductible",
-                            rule="200 > 500",
-                            message=f"{prod.key}_{var.key}: 200 must be more expensive than 500.",
-                            left_key=k200,
-                            right_key=k500,
-                            left_value=p[k200],
-                            right_value=p[k500],
-                        )
+            if v200 is not None and v500 is not None and not (v200 > v500):
+                violations.append(
+                    Violation(
+                        category="deductible",
+                        rule="200 > 500",
+                        message=f"{prod.value}_{var.value}: 200 must be more expensive than 500.",
+                        left_key=k200,
+                        right_key=k500,
+                        left_value=v200,
+                        right_value=v500,
                     )
+                )
 
         # Variant-level: within (product, deductible): base=max(compact,basic) < comfort < premium ---
-        for (prod, ded), m in group_by_product_and_deductible(items).items():
-            base_keys = [m[v] for v in (Variant.COMPACT, Variant.BASIC) if v in m]
+        for (prod, ded), (k_compact, k_basic, comfort_key, premium_key) in parsed.by_pd.items():
+            base_keys = [k for k in (k_compact, k_basic) if k is not None]
             if not base_keys:
                 continue
 
-            base = max(p[k] for k in base_keys)
+            base = max(map(getter, base_keys))
+            p_comfort = getter(comfort_key) if comfort_key is not None else None
+            p_premium = getter(premium_key) if premium_key is not None else None
 
-            if Variant.COMFORT in m:
-                comfort_key = m[Variant.COMFORT]
-                if not (base < p[comfort_key]):
-                    violations.append(
-                        Violation(
-                            category="variant",
-                            rule="base < comfort",
-                            message=f"{prod.key}_{ded.value}: comfort must be above compact/basic base.",
-                            left_key="base(compact/basic)",
-                            right_key=comfort_key,
-                            left_value=base,
-                            right_value=p[comfort_key],
-                        )
+            if p_comfort is not None and not (base < p_comfort):
+                violations.append(
+                    Violation(
+                        category="variant",
+                        rule="base < comfort",
+                        message=f"{prod.value}_{ded.value}: comfort must be above compact/basic base.",
+                        left_key="base(compact/basic)",
+                        right_key=comfort_key,
+                        left_value=base,
+                        right_value=p_comfort,
                     )
+                )
 
-            if Variant.PREMIUM in m:
-                premium_key = m[Variant.PREMIUM]
-                lower = p[m[Variant.COMFORT]] if Variant.COMFORT in m else base
-                left_name = "comfort" if Variant.COMFORT in m else "base(compact/basic)"
-                if not (lower < p[premium_key]):
+            if p_premium is not None:
+                lower = p_comfort if p_comfort is not None else base
+                left_name = "comfort" if p_comfort is not None else "base(compact/basic)"
+                if not (lower < p_premium):
                     violations.append(
                         Violation(
                             category="variant",
                             rule="comfort/base < premium",
-                            message=f"{prod.key}_{ded.value}: premium must be above comfort/base.",
+                            message=f"{prod.value}_{ded.value}: premium must be above comfort/base.",
                             left_key=left_name,
                             right_key=premium_key,
                             left_value=lower,
-                            right_value=p[premium_key],
+                            right_value=p_premium,
                         )
                     )
 
         return violations
+
+    def has_violations(self, prices: Mapping[str, float], parsed: ParsedInput) -> bool:
+        """
+            Same rules as validate, but stops at the first failing comparison
+            and builds no Violation objects or messages. The engine's inner
+            loop only needs the boolean, so the common "already consistent"
+            iteration costs a handful of comparisons.
+        """
+        p = prices
+        mtpl_key = MTPL_KEY
+        if mtpl_key not in p:
+            raise ValueError(f"Input must contain key '{mtpl_key}'.")
+
+        mtpl = p[mtpl_key]
+        getter = p.__getitem__
+
+        for prod in (Product.LIMITED_CASCO, Product.CASCO):
+            keys = parsed.by_product.get(prod)
+            if keys and not (mtpl < min(map(getter, keys))):
+                return True
+
+        for lc_key, c_key in parsed.lc_c_pairs:
+            if not (getter(lc_key) < getter(c_key)):
+                return True
+
+        for k100, k200, k500 in parsed.by_pv.values():
+            if k200 is not None:
+                v200 = getter(k200)
+                if k100 is not None and not (getter(k100) > v200):
+                    return True
+                if k500 is not None and not (v200 > getter(k500)):
+                    return True
+
+        for k_compact, k_basic, comfort_key, premium_key in parsed.by_pd.values():
+            base_keys = [k for k in (k_compact, k_basic) if k is not None]
+            if not base_keys:
+                continue
+            base = max(map(getter, base_keys))
+            p_comfort = getter(comfort_key) if comfort_key is not None else None
+            if p_comfort is not None and not (base < p_comfort):
+                return True
+            if premium_key is not None:
+                lower = p_comfort if p_comfort is not None else base
+                if not (lower < getter(premium_key)):
+                    return True
+
+        return False
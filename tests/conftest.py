@@ -1,6 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import json
 import os
 import sys
 
+import pytest
+
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
+
+from src.core import (  # noqa: E402  (needs the sys.path insert above)
+    DEDUCTIBLE_FACTOR,
+    REFERENCE_AVG_PRICE,
+    VARIANT_FACTOR,
+    Deductible,
+    Product,
+    Variant,
+)
+
+# Canonical consistent price dict, serialized once to tests/data so every
+# session loads it with the C-level json parser instead of re-running the
+# Python builder loop. The file carries a checksum of the pricing constants
+# it was derived from and is regenerated whenever those constants change.
+_DATA_FILE = os.path.join(os.path.dirname(__file__), "data", "base_prices.json")
+
+
+def _factor_checksum() -> str:
+    payload = repr((
+        sorted((p.value, f) for p, f in REFERENCE_AVG_PRICE.items()),
+        sorted((d.value, f) for d, f in DEDUCTIBLE_FACTOR.items()),
+        sorted((v.value, f) for v, f in VARIANT_FACTOR.items()),
+    ))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _build_base_prices() -> dict[str, float]:
+    prices = {"mtpl": float(REFERENCE_AVG_PRICE[Product.MTPL])}
+    for product in (Product.LIMITED_CASCO, Product.CASCO):
+        base_100 = REFERENCE_AVG_PRICE[product]
+        for v in Variant:
+            for d in Deductible:
+                prices[f"{product.value}_{v.value}_{d.value}"] = (
+                    base_100 * (VARIANT_FACTOR[v] * DEDUCTIBLE_FACTOR[d])
+                )
+    return prices
+
+
+@pytest.fixture(scope="session")
+def base_prices() -> dict[str, float]:
+    """Complete consistent price dict (mtpl=400); copy before mutating."""
+    checksum = _factor_checksum()
+    try:
+        with open(_DATA_FILE, encoding="utf-8") as fh:
+            data = json.loads(fh.read())
+        if data.get("checksum") == checksum:
+            return data["prices"]
+    except (OSError, ValueError):
+        pass
+
+    prices = _build_base_prices()
+    os.makedirs(os.path.dirname(_DATA_FILE), exist_ok=True)
+    with open(_DATA_FILE, "w", encoding="utf-8") as fh:
+        json.dump({"checksum": checksum, "prices": prices}, fh, indent=2)
+        fh.write("\n")
+    return prices
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import math
 
+import numpy as np
 import pytest
 
 from src.main import PricingEngine
@@ -15,60 +16,58 @@ from src.core import (
 
 from src.core import Deductible, Variant
 
+# The factor dicts may be keyed by plain ints/strings or by the Enums; probe
+# their shape once at import and flatten to primitive-keyed dicts so the
+# helpers are single branch-free lookups.
+_DED_FACTOR: dict[int, float] = {
+    d: float(DEDUCTIBLE_FACTOR[d if d in DEDUCTIBLE_FACTOR else Deductible(d)])  # type: ignore[operator,index]
+    for d in (100, 200, 500)
+}
+_VAR_FACTOR: dict[str, float] = {
+    v: float(VARIANT_FACTOR[v if v in VARIANT_FACTOR else Variant(v)])  # type: ignore[operator,index]
+    for v in ("compact", "basic", "comfort", "premium")
+}
+
+
 def deductible_factor(d: int) -> float:
-    """
-    Supports either:
-      - DEDUCTIBLE_FACTOR keyed by ints (100/200/500), or
-      - DEDUCTIBLE_FACTOR keyed by Deductible Enum.
-    """
-    if d in DEDUCTIBLE_FACTOR:  # type: ignore[operator]
-        return float(DEDUCTIBLE_FACTOR[d])  # type: ignore[index]
-    if Deductible is None:
-        raise KeyError(f"Missing deductible factor for {d} and no Deductible enum available.")
-    enum_map = {100: Deductible.D100, 200: Deductible.D200, 500: Deductible.D500}
-    return float(DEDUCTIBLE_FACTOR[enum_map[d]])  # type: ignore[index]
+    return _DED_FACTOR[d]
 
 
 def variant_factor(v: str) -> float:
-    """
-    Supports either:
-      - VARIANT_FACTOR keyed by strings, or
-      - VARIANT_FACTOR keyed by Variant Enum.
-    """
-    if v in VARIANT_FACTOR:  # type: ignore[operator]
-        return float(VARIANT_FACTOR[v])  # type: ignore[index]
-    if Variant is None:
-        raise KeyError(f"Missing variant factor for '{v}' and no Variant enum available.")
-    enum_map = {
-        "compact": Variant.COMPACT,
-        "basic": Variant.BASIC,
-        "comfort": Variant.COMFORT,
-        "premium": Variant.PREMIUM,
-    }
-    return float(VARIANT_FACTOR[enum_map[v]])  # type: ignore[index]
-
-
-def build_complete_consistent_prices(mtpl: float = 400.0) -> dict[str, float]:
-    prices: dict[str, float] = {"mtpl": float(mtpl)}
-    for product, base_100 in [("limited_casco", 700.0), ("casco", 900.0)]:
-        for variant in ["compact", "basic", "comfort", "premium"]:
-            for deductible in [100, 200, 500]:
-                vf = variant_factor(variant)
-                df = deductible_factor(deductible)
-                prices[f"{product}_{variant}_{deductible}"] = float(base_100 * vf * df)
-    return prices
-
-
-def test_enforces_deductible_order_exact():
-    engine = PricingEngine()
-    prices = build_complete_consistent_prices()
+    return _VAR_FACTOR[v]
+
+
+VARIANTS = ("compact", "basic", "comfort", "premium")
+DEDUCTIBLES = (100, 200, 500)
+
+# Direct key groups so tests never scan the whole dict with startswith.
+# The base_prices fixture itself lives in conftest.py and is loaded from the
+# pre-serialized tests/data/base_prices.json once per session.
+LC_KEYS = tuple(f"limited_casco_{v}_{d}" for v in VARIANTS for d in DEDUCTIBLES)
+C_KEYS = tuple(f"casco_{v}_{d}" for v in VARIANTS for d in DEDUCTIBLES)
+
+
+@pytest.fixture(scope="module")
+def engine() -> PricingEngine:
+    return PricingEngine()
+
+
+@pytest.fixture(scope="module")
+def out_buf() -> dict[str, float]:
+    """Reusable output buffer for engine calls taking out=."""
+    return {}
+
+
+def test_enforces_deductible_order_exact(engine, base_prices, out_buf):
+    prices = dict(base_prices)
 
     # Break ladder: make 200 and 500 more expensive than 100
     prices["casco_basic_200"] = prices["casco_basic_100"] * 2.0
     prices["casco_basic_500"] = prices["casco_basic_100"] * 3.0
 
-    res = engine.validate_and_fix(prices)
+    res = engine.validate_and_fix(prices, out=out_buf)
     fixed = res.fixed_prices
+    assert fixed is out_buf  # results land in the caller-provided buffer
 
     assert math.isclose(
         fixed["casco_basic_200"],
@@ -83,9 +82,8 @@ def test_enforces_deductible_order_exact():
     assert res.converged is True
 
 
-def test_enforces_variant_order_rebuilds_ladder_when_violated():
-    engine = PricingEngine()
-    prices = build_complete_consistent_prices()
+def test_enforces_variant_order_rebuilds_ladder_when_violated(engine, base_prices):
+    prices = dict(base_prices)
 
     # Break variant ordering: comfort/premium below base(compact/basic)
     prices["limited_casco_comfort_100"] = prices["limited_casco_basic_100"] * 0.5
@@ -101,36 +99,36 @@ def test_enforces_variant_order_rebuilds_ladder_when_violated():
     assert res.converged is True
 
 
-def test_product_minima_ratios_no_change_when_order_ok():
-    engine = PricingEngine()
-    prices = build_complete_consistent_prices()
+def test_product_minima_ratios_no_change_when_order_ok(engine, base_prices):
+    prices = dict(base_prices)
 
     res = engine.validate_and_fix(prices)
     fixed = res.fixed_prices
 
     # If already consistent, nothing should change (use approx for float stability)
-    for k, v in prices.items():
-        assert fixed[k] == pytest.approx(v, rel=0.0, abs=1e-12)
+    keys = list(prices)
+    before = np.fromiter(map(prices.__getitem__, keys), dtype=np.float64, count=len(keys))
+    after = np.fromiter(map(fixed.__getitem__, keys), dtype=np.float64, count=len(keys))
+    assert np.allclose(before, after, rtol=0.0, atol=1e-12)
 
     assert res.converged is True
 
 
-def test_enforces_product_minima_ratios_when_group_min_below_mtpl():
-    engine = PricingEngine()
-    prices = build_complete_consistent_prices(mtpl=400.0)
+def test_enforces_product_minima_ratios_when_group_min_below_mtpl(engine, base_prices):
+    # the shared fixture already uses mtpl=400.0
+    prices = dict(base_prices)
 
     # Create an ordering violation WITHOUT touching MTPL (avoid anchor interactions):
     # scale down both groups so their minima fall below MTPL.
-    for k in list(prices.keys()):
-        if k.startswith("limited_casco_") or k.startswith("casco_"):
-            prices[k] *= 0.25  # minima now below 400 -> triggers product-min fix
+    # minima now below 400 -> triggers product-min fix
+    prices.update({k: prices[k] * 0.25 for k in LC_KEYS + C_KEYS})
 
     res = engine.validate_and_fix(prices)
     fixed = res.fixed_prices
 
     mtpl = fixed["mtpl"]
-    lc_min = min(v for k, v in fixed.items() if k.startswith("limited_casco_"))
-    c_min = min(v for k, v in fixed.items() if k.startswith("casco_"))
+    lc_min = min(map(fixed.__getitem__, LC_KEYS))
+    c_min = min(map(fixed.__getitem__, C_KEYS))
 
     # After fixing, minima are set to ratio * MTPL (via group scaling)
     assert lc_min >= RATIO_LC_OVER_MTPL * mtpl - 1e-9
@@ -138,9 +136,8 @@ def test_enforces_product_minima_ratios_when_group_min_below_mtpl():
     assert res.converged is True
 
 
-def test_enforces_limited_casco_less_than_casco_matched():
-    engine = PricingEngine()
-    prices = build_complete_consistent_prices()
+def test_enforces_limited_casco_less_than_casco_matched(engine, base_prices):
+    prices = dict(base_prices)
 
     # Break matched ordering for (basic, 100)
     prices["limited_casco_basic_100"] = 2000.0
@@ -155,3 +152,35 @@ def test_enforces_limited_casco_less_than_casco_matched():
     assert fixed["casco_basic_100"] == pytest.approx(RATIO_C_OVER_LC * fixed["limited_casco_basic_100"], abs=1e-9)
 
     assert res.converged is True
+
+
+def test_missing_mtpl_raises_value_error(engine, base_prices):
+    prices = dict(base_prices)
+    del prices["mtpl"]
+
+    with pytest.raises(ValueError, match="must contain key 'mtpl'"):
+        engine.validate_and_fix(prices)
+
+
+def test_batch_api_matches_single_solves(engine, base_prices):
+    # Three scenarios from the tests above, solved in one batch call.
+    broken_ladder = dict(base_prices)
+    broken_ladder["casco_basic_200"] = broken_ladder["casco_basic_100"] * 2.0
+    broken_ladder["casco_basic_500"] = broken_ladder["casco_basic_100"] * 3.0
+
+    broken_pair = dict(base_prices)
+    broken_pair["limited_casco_basic_100"] = 2000.0
+    broken_pair["casco_basic_100"] = 1500.0
+
+    scenarios = [dict(base_prices), broken_ladder, broken_pair]
+    columns = list(base_prices)
+    matrix = np.array([[s[k] for k in columns] for s in scenarios])
+
+    fixed, converged, iterations = engine.validate_and_fix_batch(matrix, columns)
+
+    assert converged.all()
+    assert (iterations >= 1).all()
+    for row, scenario in enumerate(scenarios):
+        single = engine.validate_and_fix(scenario)
+        expected = np.array([single.fixed_prices[k] for k in columns])
+        assert np.allclose(fixed[row], expected, rtol=0.0, atol=1e-9)
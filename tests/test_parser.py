@@ -9,12 +9,7 @@ def test_parse_mtpl():
     p = DefaultPriceParser()
     item = p.parse_key("mtpl")
 
-    # product
-    if Product is None:
-        assert item.product == "mtpl"
-    else:
-        assert item.product == Product.MTPL  # type: ignore[attr-defined]
-
+    assert item.product == Product.MTPL
     assert item.variant is None
     assert item.deductible is None
 
@@ -23,20 +18,9 @@ def test_parse_regular_key():
     p = DefaultPriceParser()
     item = p.parse_key("casco_basic_200")
 
-    if Product is None:
-        assert item.product == "casco"
-    else:
-        assert item.product == Product.CASCO  # type: ignore[attr-defined]
-
-    if Variant is None:
-        assert item.variant == "basic"
-    else:
-        assert item.variant == Variant.BASIC  # type: ignore[attr-defined]
-
-    if Deductible is None:
-        assert item.deductible == 200
-    else:
-        assert item.deductible == Deductible.D200  # type: ignore[attr-defined]
+    assert item.product == Product.CASCO
+    assert item.variant == Variant.BASIC
+    assert item.deductible == Deductible.D200
 
 
 def test_invalid_key_raises():